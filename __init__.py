@@ -16,10 +16,14 @@ Lou: An interface for tracking my dice collection. (cmdr.Cmdr)
 Functions:
 encode: Translate the features of a die to a code for the die. (str)
 go: Run the dice collection interface. (Lou)
+total_dice: Count the dice in a set of dice. (int)
 """
 
 import collections
+import operator
 import os
+import re
+import sys
 
 import cmdr
 import ick_text as txt
@@ -38,6 +42,44 @@ FLAGS = ('art_pip', 'material', 'odd_shape', 'odd_pip', 'odd_face')
 
 SIZES = {'S': 'small', 'M': 'medium', 'L': 'large', 'H': 'huge', 'G': 'gigantic'}
 
+# Intern the full color and size names, so filter words can be matched by identity.
+for code, name in COLORS.items():
+	COLORS[code] = sys.intern(name)
+for code, name in SIZES.items():
+	SIZES[code] = sys.intern(name)
+
+# Sets of the full color and size names, for recognizing filter words.
+_COLOR_NAMES = frozenset(COLORS.values())
+_SIZE_NAMES = frozenset(SIZES.values())
+
+# Lists of the full color and size names, for input menus.
+_COLOR_LIST = list(COLORS.values())
+_SIZE_LIST = list(SIZES.values())
+
+# The filter functions, keyed by name without the 'is_' prefix.
+_FILTERS = {name[3:]: func for name, func in vars(filter_funcs).items() if callable(func) and name.startswith('is_')}
+
+# Lookup tables for parsing and generating die codes and testing flags.
+_FLAG_BITS = {flag: 2 ** power for power, flag in enumerate(FLAGS)}
+_NUMBERS = {f'{n:03}': n for n in range(1000)}
+_THREE_DIGITS = tuple(f'{n:03}' for n in range(1000))
+_TWO_DIGITS = tuple(f'{n:02}' for n in range(100))
+
+# The flag bits for the letters in the flag menu.
+_LETTER_BITS = {letter: 2 ** power for power, letter in enumerate('abcde')}
+
+# Filter words for the numeric features (dX for sides, fX for faces).
+_NUMBER_FEATURES = {'d': operator.attrgetter('sides'), 'f': operator.attrgetter('faces')}
+_NUMBER_WORD = re.compile(r'([df])(\d+)')
+
+# The flag text for every value of the two digit flag field, for __str__ and table_row.
+_FLAG_LABELS = tuple(flag.replace('_', ' ') for flag in FLAGS)
+_FLAG_PADS = tuple(' ' * len(flag) for flag in FLAGS)
+_FLAG_SETS = tuple(tuple(label for power, label in enumerate(_FLAG_LABELS) if n & (2 ** power)) for n in range(100))
+_FLAG_SUFFIXES = tuple(' ({})'.format(', '.join(labels)) if labels else '' for labels in _FLAG_SETS)
+_FLAG_COLUMNS = tuple(' '.join(_FLAG_LABELS[power] if n & (2 ** power) else _FLAG_PADS[power]
+	for power in range(len(FLAGS))) for n in range(100))
+
 class Die(object):
 	"""
 	A unique die type within the collection. (object)
@@ -48,6 +90,7 @@ class Die(object):
 	color: The color of the die. (str)
 	count: The number of dice of this type. (int)
 	faces: The number of unique faces on the die. (int)
+	flags: The binary flags for the die. (int)
 	material: A flag for a non-plastic material. (bool)
 	odd_face: A flag for the faces not being 1 to the number of sides. (bool)
 	odd_pip: A flag for pips that are not dots or numbers. (bool)
@@ -55,17 +98,30 @@ class Die(object):
 	sides: The number of sides on the die. (int)
 	size: The size of the die. (str)
 
+	Class Attributes:
+	ART_PIP: The bit for the art_pip flag. (int)
+	MATERIAL: The bit for the material flag. (int)
+	ODD_FACE: The bit for the odd_face flag. (int)
+	ODD_PIP: The bit for the odd_pip flag. (int)
+	ODD_SHAPE: The bit for the odd_shape flag. (int)
+
 	Methods:
 	table_row: A text representation where everything lines up in columns. (str)
 
 	Overridden Methods:
 	__init__
-	__add__
-	__radd__
 	__repr__
 	__str__
 	"""
 
+	__slots__ = ('code', 'count', 'color', 'size', 'sides', 'faces', 'flags')
+
+	ART_PIP = _FLAG_BITS['art_pip']
+	MATERIAL = _FLAG_BITS['material']
+	ODD_SHAPE = _FLAG_BITS['odd_shape']
+	ODD_PIP = _FLAG_BITS['odd_pip']
+	ODD_FACE = _FLAG_BITS['odd_face']
+
 	def __init__(self, code, count):
 		"""
 		Parse the die data. (None)
@@ -80,34 +136,34 @@ class Die(object):
 		# Parse the code.
 		self.color = COLORS[code[:3]]
 		self.size = SIZES[code[3]]
-		self.sides = int(code[4:7])
-		self.faces = int(code[7:10])
-		flags = int(code[-2:])
-		for power, attribute in enumerate(FLAGS):
-			setattr(self, attribute, bool(flags & (2 ** power)))
-
-	def __add__(self, other):
-		"""
-		Addition by count. (int)
-
-		Parameters:
-		other: The item to add to. (Die or int)
-		"""
-		if isinstance(other, Die):
-			return self.count + other.count
-		elif isinstance(other, int):
-			return self.count + other
-		else:
-			return NotImplemented
-
-	def __radd__(self, other):
-		"""
-		Right-handed addition by count. (int)
-
-		Parameters:
-		other: The item to add to. (Die or int)
-		"""
-		return self + other
+		self.sides = _NUMBERS[code[4:7]]
+		self.faces = _NUMBERS[code[7:10]]
+		self.flags = int(code[-2:])
+
+	@property
+	def art_pip(self):
+		"""A flag for unusual max and/or min pip. (bool)"""
+		return bool(self.flags & Die.ART_PIP)
+
+	@property
+	def material(self):
+		"""A flag for a non-plastic material. (bool)"""
+		return bool(self.flags & Die.MATERIAL)
+
+	@property
+	def odd_face(self):
+		"""A flag for the faces not being 1 to the number of sides. (bool)"""
+		return bool(self.flags & Die.ODD_FACE)
+
+	@property
+	def odd_pip(self):
+		"""A flag for pips that are not dots or numbers. (bool)"""
+		return bool(self.flags & Die.ODD_PIP)
+
+	@property
+	def odd_shape(self):
+		"""A flag for a non-platonicish shape. (bool)"""
+		return bool(self.flags & Die.ODD_SHAPE)
 
 	def __repr__(self):
 		"""Debugging text representation. (str)"""
@@ -118,10 +174,7 @@ class Die(object):
 		text = f'{self.size} {self.color} d{self.sides}'
 		if self.faces != self.sides:
 			text = f'{text}/{self.faces}'
-		flags = [flag.replace('_', ' ') for flag in FLAGS if getattr(self, flag)]
-		if flags:
-			text = '{} ({})'.format(text, ', '.join(flags))
-		return text
+		return f'{text}{_FLAG_SUFFIXES[self.flags]}'
 
 	def data(self):
 		"""Data storage text representation. (str)"""
@@ -130,24 +183,24 @@ class Die(object):
 	def table_row(self):
 		"""A text representation where everything lines up in columns. (str)"""
 		text = f'{self.count:<3} {self.size:<8} {self.color:<11} d{self.sides:<3}/d{self.faces:<3}'
-		flag_bits = [flag.replace('_', ' ') if getattr(self, flag) else ' ' * len(flag) for flag in FLAGS]
-		text = '{} {}'.format(text, ' '.join(flag_bits))
-		return text
+		return f'{text} {_FLAG_COLUMNS[self.flags]}'
 
 class Lou(cmdr.Cmdr):
 	"""
 	An interface for tracking my dice collection. (cmdr.Cmdr)
 
 	Attributes:
+	by_code: The dice in the collection, keyed by code. (dict of str: Die)
 	changes: What changes have been made to the data. (str)
-	current: The current subset of the whole collection. (list of Die)
+	current: The current subset of the whole collection, possibly dice itself. (list of Die)
 	dice: The dice in the collection. (list of Die)
 	loc: The file system location of this file. (str)
 	new_rows: Any new rows added to the data. (list of Die)
 	subsets: Temporarily stored subsets of the dice. (dict of str: list)
+	total_count: The number of dice in the collection. (int)
 
 	Class Attributes:
-	filter_funcs: Functions for filtering dice. (dict of str:callable)
+	filters: Functions for filtering dice. (dict of str: callable)
 
 	Methods:
 	do_add: Add dice to the collection. (None)
@@ -160,6 +213,7 @@ class Lou(cmdr.Cmdr):
 	do_subset: Make a subset of the current set of dice. (sub)
 	do_table: Print a table of the current subset. (None)
 	filter: Filter a set of dice. (list of Die)
+	filter_test: Get the test for a word in the filter criteria. (callable or None)
 	load_data: Load the stored dice data. (None)
 	print_count: Print the count of the current subset. (None)
 
@@ -169,6 +223,7 @@ class Lou(cmdr.Cmdr):
 	"""
 
 	aliases = {'q': 'quit', 'sub': 'subset'}
+	filters = _FILTERS
 	prompt = 'DICE:: '
 
 	def __repr__(self):
@@ -186,8 +241,8 @@ class Lou(cmdr.Cmdr):
 		Gargantuan: Just silly
 		"""
 		# Get the dice features from the user.
-		color = txt.input_menu('What color are the dice? ', list(COLORS.values()))
-		size = txt.input_menu('What size are the dice? ', list(SIZES.values()))
+		color = txt.input_menu('What color are the dice? ', _COLOR_LIST)
+		size = txt.input_menu('What size are the dice? ', _SIZE_LIST)
 		sides = txt.input_int('How many sides do the dice have? ', low = 1)
 		face_query = f'How many unique faces do the dice have (return for {sides})? '
 		faces = txt.input_int(face_query, low = 1, default = sides)
@@ -197,52 +252,65 @@ class Lou(cmdr.Cmdr):
 			print(menu)
 			choices = input('Enter any of the above items that fit the dice: ')
 			try:
-				flags = sum([2 ** 'abcde'.index(letter) for letter in choices.lower()])
-			except IndexError:
-				print('Please only enter the letters A throug E.')
+				flags = 0
+				for letter in choices.lower():
+					flags |= _LETTER_BITS[letter]
+			except KeyError:
+				print('Please only enter the letters A through E.')
 			else:
 				break
 		# Get the quantity from the user.
 		count = txt.input_int('How many of these dice are you adding to the collection? ', low = 1)
 		# Get the code for the dice to be entered.
-		code = encode(color, size, sides, faces, flags)
+		try:
+			code = encode(color, size, sides, faces, flags)
+		except ValueError as error:
+			print(f'{error} No dice were added.')
+			return
 		# Look for matching dice already in the collection.
-		matches = [die for die in self.dice if die.code == code]
+		existing = self.by_code.get(code)
 		# Enter the dice.
-		if matches:
-			matches[0].count += count
+		if existing:
+			existing.count += count
 			self.changes = True
 		else:
-			self.dice.append(Die(code, count))
-			self.new_rows.append(self.dice[-1])
+			die = Die(code, count)
+			self.dice.append(die)
+			self.by_code[code] = die
+			self.new_rows.append(die)
+		self.total_count += count
 		# Let the user know the updated count.
 		print()
-		print(f'You now have {sum(self.dice)} dice.')
+		print(f'You now have {self.total_count} dice.')
 
 	def do_add7(self, arguments):
 		"""
 		Add a standard seven die set to the collection.
 		"""
 		# Get the dice color from the user.
-		color = txt.input_menu('What color are the dice? ', list(COLORS.values()))
+		color = txt.input_menu('What color are the dice? ', _COLOR_LIST)
+		color_code = _color_code(color)
 		for sides in (4, 6, 8, 10, 100, 12, 20):
 			# Get the code for the dice to be entered.
 			if sides == 100:
-				code = encode(color, 'M', 10, 10, 16)
+				code = _encode_codes(color_code, 'M', 10, 10, 16)
 			else:
-				code = encode(color, 'M', sides, sides, 0)
+				code = _encode_codes(color_code, 'M', sides, sides, 0)
 			# Look for matching dice already in the collection.
-			matches = [die for die in self.dice if die.code == code]
+			existing = self.by_code.get(code)
 			# Enter the dice.
-			if matches:
-				matches[0].count += 1
+			if existing:
+				existing.count += 1
 				self.changes = True
 			else:
-				self.dice.append(Die(code, 1))
-				self.new_rows.append(self.dice[-1])
+				die = Die(code, 1)
+				self.dice.append(die)
+				self.by_code[code] = die
+				self.new_rows.append(die)
+			self.total_count += 1
 		# Let the user know the updated count.
 		print()
-		print(f'You now have {sum(self.dice)} dice.')
+		print(f'You now have {self.total_count} dice.')
 
 	def do_count(self, arguments):
 		"""
@@ -253,19 +321,21 @@ class Lou(cmdr.Cmdr):
 		"""
 		# Parse the arguments.
 		feature = arguments.lower().replace('-', '_')
-		# Validate the feature.
+		get_feature = operator.attrgetter(feature)
+		# Validate the feature (attrgetter would follow dotted names).
 		try:
-			getattr(self.current[0], feature)
+			if '.' in feature:
+				raise AttributeError(feature)
+			get_feature(self.current[0])
 		except AttributeError:
 			print(f'Invalid die feature: {arguments!r}.')
 			return
 		# Calculate the counts.
-		counts = collections.defaultdict(int)
+		counts = collections.Counter()
 		for die in self.current:
-			value = getattr(die, feature)
-			counts[value] += die.count
+			counts[get_feature(die)] += die.count
 		# Display the counts.
-		max_len = max([len(str(value)) for value in counts.keys()])
+		max_len = max(map(len, map(str, counts)))
 		template = '{{:>{}}} {{}}'.format(max_len)
 		for value, count in counts.items():
 			print(template.format(value, count))
@@ -278,7 +348,7 @@ class Lou(cmdr.Cmdr):
 		will load all of the dice.
 		"""
 		if arguments.lower() == 'all':
-			self.current = self.dice[:]
+			self.current = self.dice
 		else:
 			self.current = self.subsets[arguments]
 		self.print_count()
@@ -298,17 +368,17 @@ class Lou(cmdr.Cmdr):
 		"""
 		if self.changes:
 			with open(os.path.join(self.loc, 'dice.dat'), 'w') as dice_file:
-				for die in self.dice:
-					dice_file.write(die.data())
+				dice_file.write(''.join(die.data() for die in self.dice))
 			self.changes = False
+			self.new_rows.clear()
 			rows = len(self.dice)
 			s = '' if rows == 1 else 's'
 			print(f'{rows} row{s} were written to the stored data.')
 		elif self.new_rows:
 			rows = len(self.new_rows)
 			with open(os.path.join(self.loc, 'dice.dat'), 'a') as dice_file:
-				while self.new_rows:
-					dice_file.write(self.new_rows.pop().data())
+				dice_file.write(''.join(die.data() for die in self.new_rows))
+			self.new_rows.clear()
 			s = '' if rows == 1 else 's'
 			print(f'{rows} row{s} were added to the stored data.')
 		else:
@@ -320,7 +390,8 @@ class Lou(cmdr.Cmdr):
 
 		Stored subsets are discarded when this system is closed.
 		"""
-		self.subsets[arguments] = self.current
+		# Copy the subset, since the current subset may be the growing list of all dice.
+		self.subsets[arguments] = self.current[:]
 
 	def do_subset(self, arguments):
 		"""
@@ -346,62 +417,79 @@ class Lou(cmdr.Cmdr):
 		base: The set of dice to filter. (list of Die)
 		arguments: The criteria for filtering the dice. (str)
 		"""
-		# Run the filters
-		output = base[:]
+		# Work out the tests for all of the words before touching the dice.
+		tests = []
 		for word in arguments.lower().split():
-			# Handle aliases from the code.
-			word = COLORS.get(word.upper(), word)
-			word = SIZES.get(word.upper(), word)
-			# Filter the basic attributes.
-			if word in COLORS.values():
-				output = [die for die in output if die.color == word]
-			elif word in SIZES.values():
-				output = [die for die in output if die.color == word]
-			elif word.startswith('d') and word[1:].isnumeric():
-				output = [die for die in output if die.sides == int(word[1:])]
-			elif word.startswith('f') and word[1:].isnumeric():
-				output = [die for die in output if die.faces == int(word[1:])]
+			test = self.filter_test(word)
+			if test is None:
+				# Print a warning for unrecognized filters.
+				print(f'Unrecognized filter criteria: {word}.')
 			else:
-				# Filter the flag attributes and filter functions.
-				flag_word = word.replace('-', '_')
-				if flag_word in FLAGS:
-					output = [die for die in output if getattr(die, flag_word)]
-				elif flag_word[0] == '!' and flag_word[1:] in FLAGS:
-					output = [die for die in output if not getattr(die, flag_word[1:])]
-				elif flag_word in self.filters:
-					output = list(filter(self.filters[flag_word], output))
-				else:
-					# Print a warning for unrecognized filters.
-					print(f'Unrecognized filter criteria: {word}.')
+				tests.append(test)
+		# Run the filters (each one builds a new list, so base is never modified).
+		output = base
+		for test in tests:
+			output = [die for die in output if test(die)]
 		self.current = output
 		self.print_count()
 		return output
 
+	def filter_test(self, word):
+		"""
+		Get the test for a word in the filter criteria. (callable or None)
+
+		Parameters:
+		word: The lower case filter word. (str)
+		"""
+		# Handle aliases from the code.
+		word = COLORS.get(word.upper(), word)
+		word = SIZES.get(word.upper(), word)
+		# Test the basic attributes.
+		if word in _COLOR_NAMES:
+			word = sys.intern(word)
+			return lambda die: die.color is word
+		elif word in _SIZE_NAMES:
+			word = sys.intern(word)
+			return lambda die: die.size is word
+		match = _NUMBER_WORD.fullmatch(word)
+		if match:
+			feature = _NUMBER_FEATURES[match.group(1)]
+			number = int(match.group(2))
+			return lambda die: feature(die) == number
+		# Test the flag attributes, or use a filter function.
+		flag_word = word.replace('-', '_')
+		if flag_word in _FLAG_BITS:
+			bit = _FLAG_BITS[flag_word]
+			return lambda die: die.flags & bit
+		elif flag_word[0] == '!' and flag_word[1:] in _FLAG_BITS:
+			bit = _FLAG_BITS[flag_word[1:]]
+			return lambda die: not die.flags & bit
+		return self.filters.get(flag_word)
+
 	def load_data(self):
 		"""Load the stored dice data. (None)"""
-		self.dice = []
+		# Read the codes and counts in one pass.
 		with open(os.path.join(self.loc, 'dice.dat')) as dice_file:
-			for line in dice_file:
-				code, count = line.split('\t')
-				self.dice.append(Die(code, int(count)))
-		self.dice.sort(key = lambda die: die.code)
+			rows = sorted(line.split('\t') for line in dice_file)
+		self.dice = [Die(code, int(count)) for code, count in rows]
+		self.by_code = {die.code: die for die in self.dice}
+		self.total_count = total_dice(self.dice)
 
 	def preloop(self):
 		"""Prepare the command loop. (None)"""
 		self.loc = os.path.dirname(os.path.abspath(__file__))
 		self.load_data()
-		self.current = self.dice[:]
+		self.current = self.dice
 		self.subsets = {}
-		self.filters = {name[3:]: func for name, func in filter_funcs.__dict__.items() if callable(func)}
 		print('Welcome to your dice collection.')
-		print(f'You have {sum(self.dice)} dice.')
+		print(f'You have {self.total_count} dice.')
 		print()
 		self.changes = False
 		self.new_rows = []
 
 	def print_count(self):
 		"""Print the count of the current subset. (None)"""
-		total = sum(self.current)
+		total = total_dice(self.current)
 		to_be = 'is' if total == 1 else 'are'
 		d_word = 'die' if total == 1 else 'dice'
 		print(f'There {to_be} {total} {d_word} in the current subset.')
@@ -417,19 +505,63 @@ def encode(color, size, sides, faces, flags):
 	faces: The number of unique faces on the die. (int)
 	flags: The binary flags for the die. (int)
 	"""
-	# Get the color code.
+	# Check that the numbers fit in their fields.
+	if not 0 <= sides < 1000:
+		raise ValueError(f'Cannot encode {sides!r} sides.')
+	if not 0 <= faces < 1000:
+		raise ValueError(f'Cannot encode {faces!r} faces.')
+	if not 0 <= flags < 100:
+		raise ValueError(f'Cannot encode the flags {flags!r}.')
+	return _encode_codes(_color_code(color), _size_code(size), sides, faces, flags)
+
+def _color_code(color):
+	"""
+	Get the validated code for a color. (str)
+
+	Parameters:
+	color: The color of the die. (str)
+	"""
 	color_code = color[:3].upper()
 	if color_code not in COLORS:
 		raise ValueError(f'Cannot encode the color {color!r}.')
-	# Get the size code.
+	return color_code
+
+def _encode_codes(color_code, size_code, sides, faces, flags):
+	"""
+	Generate a die code from already validated color and size codes. (str)
+
+	Parameters:
+	color_code: The code for the color of the die. (str)
+	size_code: The code for the size of the die. (str)
+	sides: The number of sides on the die. (int)
+	faces: The number of unique faces on the die. (int)
+	flags: The binary flags for the die. (int)
+	"""
+	return f'{color_code}{size_code}{_THREE_DIGITS[sides]}{_THREE_DIGITS[faces]}{_TWO_DIGITS[flags]}'
+
+def _size_code(size):
+	"""
+	Get the validated code for a size. (str)
+
+	Parameters:
+	size: The size of the die. (str)
+	"""
 	size_code = size[0].upper()
 	if size_code not in SIZES:
 		raise ValueError(f'Cannot encode the size {size!r}.')
-	# Generate the code.
-	return f'{color_code}{size_code}{sides:03}{faces:03}{flags:02}'
+	return size_code
 
 def go():
 	"""Run the dice collection interface. (Lou)"""
 	lou = Lou()
 	lou.cmdloop()
 	return lou
+
+def total_dice(dice):
+	"""
+	Count the dice in a set of dice. (int)
+
+	Parameters:
+	dice: The set of dice to count. (list of Die)
+	"""
+	return sum(die.count for die in dice)
@@ -19,15 +19,13 @@ def clean_data(path):
 	path: The file system path to the file to clean. (str)
 	"""
 	with open(path, 'r+') as data_file:
-		cleaned = []
-		for line in data_file:
-			if line.endswith('\t\n'):
-				cleaned.append(line[:-1] + '1\n')
-			else:
-				cleaned.append(line)
-		data_file.seek(0)
-		data_file.write(''.join(cleaned))
-		data_file.truncate()
+		data = data_file.read()
+		# A tab at the end of a line means a blank count.
+		cleaned = data.replace('\t\n', '\t1\n')
+		if cleaned != data:
+			data_file.seek(0)
+			data_file.write(cleaned)
+			data_file.truncate()
 
 def read_data(path, value_type = int):
 	"""
@@ -41,5 +39,5 @@ def read_data(path, value_type = int):
 	with open(path) as data_file:
 		for line in data_file:
 			value, count = line.strip().split('\t')
-			data.update({value_type(value): int(count)})
+			data[value_type(value)] += int(count)
 	return data